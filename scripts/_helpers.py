@@ -712,6 +712,67 @@ def read_geojson(fn, cols=[], dtype=None, crs="EPSG:4326"):
         return df
 
 
+def locate_bus(df, gadm_shapes, col_x="x", col_y="y", col_country="country"):
+    """
+    Function to locate the points of a dataframe into the GADM shapes of their
+    country. The points of each country are located by a single spatial join;
+    points that do not fall into any shape of their country are assigned to
+    the closest one (fixing https://github.com/pypsa-meets-earth/pypsa-earth/pull/670).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Dataframe with the coordinates and the country of the points
+    gadm_shapes : gpd.GeoDataFrame
+        GADM shapes identified by the "GADM_ID" column
+    col_x : str
+        Column of df with the x coordinate (longitude) of the points
+    col_y : str
+        Column of df with the y coordinate (latitude) of the points
+    col_country : str
+        Column of df with the 2-digit country code of the points
+
+    Returns
+    -------
+    gadm_id : pd.Series
+        GADM_ID of the shape of each point, indexed as df
+    """
+    points = gpd.GeoDataFrame(
+        df[[col_country]],
+        geometry=gpd.points_from_xy(df[col_x].astype(float), df[col_y].astype(float)),
+        crs=gadm_shapes.crs,
+    )
+
+    # the shapes of each country are selected once and reused for all its points
+    shapes_by_country = {
+        co: gadm_shapes.loc[
+            gadm_shapes["GADM_ID"].str.contains(co), ["GADM_ID", "geometry"]
+        ]
+        for co in points[col_country].unique()
+    }
+
+    located = []
+    for co, points_co in points.groupby(col_country):
+        joined = gpd.sjoin(
+            points_co, shapes_by_country[co], how="left", predicate="within"
+        )
+        # points on the border of two shapes are assigned to the first one
+        located.append(joined.loc[~joined.index.duplicated(), "GADM_ID"])
+
+    gadm_id = pd.concat(located).reindex(df.index)
+
+    # looks for the closest shape of the country when the point is not within any,
+    # querying the spatial index (STRtree) of the country shapes
+    for co, points_co in points.loc[gadm_id.isnull()].groupby(col_country):
+        shapes_co = shapes_by_country[co]
+        point_i, shape_i = shapes_co.sindex.nearest(
+            points_co.geometry, return_all=False
+        )
+        gadm_id[points_co.index[point_i]] = shapes_co["GADM_ID"].values[shape_i]
+
+    return gadm_id
+
+
 def create_country_list(input, iso_coding=True):
     """
     Create a country list for defined regions..
@@ -190,17 +190,23 @@ def load_costs(tech_costs, config, elec_config, Nyears=1):
         )
 
     max_hours = elec_config["max_hours"]
-    costs.loc["battery"] = costs_for_storage(
-        costs.loc["battery storage"],
-        costs.loc["battery inverter"],
-        max_hours=max_hours["battery"],
-    )
-    costs.loc["H2"] = costs_for_storage(
-        costs.loc["hydrogen storage tank"],
-        costs.loc["fuel cell"],
-        costs.loc["electrolysis"],
-        max_hours=max_hours["H2"],
-    )
+    # storage costs are collected first and appended in a single concat
+    storage_costs = pd.DataFrame(
+        {
+            "battery": costs_for_storage(
+                costs.loc["battery storage"],
+                costs.loc["battery inverter"],
+                max_hours=max_hours["battery"],
+            ),
+            "H2": costs_for_storage(
+                costs.loc["hydrogen storage tank"],
+                costs.loc["fuel cell"],
+                costs.loc["electrolysis"],
+                max_hours=max_hours["H2"],
+            ),
+        }
+    ).T.rename_axis(costs.index.name)
+    costs = pd.concat([costs.drop(storage_costs.index, errors="ignore"), storage_costs])
 
     for attr in ("marginal_cost", "capital_cost"):
         overwrites = config.get(attr)
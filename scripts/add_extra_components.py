@@ -246,7 +246,7 @@ def attach_hydrogen_pipelines(n, costs, config):
     h2_links = candidates[
         ~pd.DataFrame(np.sort(candidates[["bus0", "bus1"]])).duplicated()
     ]
-    h2_links.index = h2_links.apply(lambda c: f"H2 pipeline {c.bus0}-{c.bus1}", axis=1)
+    h2_links.index = "H2 pipeline " + h2_links["bus0"] + "-" + h2_links["bus1"]
 
     # add pipelines
     n.madd(
@@ -44,9 +44,9 @@ logger = create_logger(__name__)
 
 
 # Functions
-def haversine(p):
-    coord0 = n.buses.loc[p.bus0, ["x", "y"]].values
-    coord1 = n.buses.loc[p.bus1, ["x", "y"]].values
+def haversine(n, edges):
+    coord0 = n.buses.loc[edges.bus0, ["x", "y"]].values
+    coord1 = n.buses.loc[edges.bus1, ["x", "y"]].values
     return 1.5 * haversine_pts(coord0, coord1)
 
 
@@ -92,15 +92,9 @@ if __name__ == "__main__":
 
     # find all complement edges, info on complement edges https://www.geeksforgeeks.org/complement-of-graph/
     complement_edges = pd.DataFrame(complement(G).edges, columns=["bus0", "bus1"])
-    complement_edges["length"] = complement_edges.apply(haversine, axis=1)
-    complement_edges["interconnector"] = np.invert(
-        [
-            (
-                complement_edges.loc[x, "bus0"][0:2]
-                == complement_edges.loc[x, "bus1"][0:2]
-            )
-            for x in complement_edges.index
-        ]
+    complement_edges["length"] = haversine(n, complement_edges)
+    complement_edges["interconnector"] = (
+        complement_edges["bus0"].str[0:2] != complement_edges["bus1"].str[0:2]
     )
 
     # apply k_edge_augmentation weighted by length of complement edges
@@ -110,9 +104,9 @@ if __name__ == "__main__":
         G, k_edge, avail=complement_edges[["bus0", "bus1", "length"]].values
     )
     new_kedge_lines = pd.DataFrame(augmentation, columns=["bus0", "bus1"])
-    new_kedge_lines["length"] = new_kedge_lines.apply(haversine, axis=1)
-    new_kedge_lines.index = new_kedge_lines.apply(
-        lambda x: f"lines new {x.bus0} <-> {x.bus1}", axis=1
+    new_kedge_lines["length"] = haversine(n, new_kedge_lines)
+    new_kedge_lines.index = (
+        "lines new " + new_kedge_lines["bus0"] + " <-> " + new_kedge_lines["bus1"]
     )
 
     # random sampling for long lines above <min DC length [km]>, including min and max distance, excluding interconnectors
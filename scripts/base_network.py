@@ -56,6 +56,7 @@ Description
 -----------
 """
 import os
+from functools import lru_cache
 
 import geopandas as gpd
 import networkx as nx
@@ -63,10 +64,9 @@ import numpy as np
 import pandas as pd
 import pypsa
 import scipy as sp
+import shapely
 import shapely.prepared
-import shapely.wkt
 from _helpers import configure_logging, create_logger, read_csv_nafix
-from shapely.ops import unary_union
 
 logger = create_logger(__name__)
 
@@ -86,8 +86,12 @@ def get_country(df):
 
 
 def _find_closest_links(links, new_links, distance_upper_bound=1.5):
-    treecoords = np.asarray(
-        [np.asarray(shapely.wkt.loads(s))[[0, -1]].flatten() for s in links.geometry]
+    geoms = shapely.from_wkt(links.geometry.values)
+    treecoords = np.hstack(
+        [
+            shapely.get_coordinates(shapely.get_point(geoms, 0)),
+            shapely.get_coordinates(shapely.get_point(geoms, -1)),
+        ]
     )
     querycoords = np.vstack(
         [new_links[["x1", "y1", "x2", "y2"]], new_links[["x2", "y2", "x1", "y1"]]]
@@ -127,15 +131,24 @@ def _load_buses_from_osm(fp_buses):
     return buses
 
 
+@lru_cache
+def _load_offshore_shape(fp_offshore_shapes):
+    """
+    Return the union of the offshore shapes; the file is read and merged only
+    once, as the union is needed for the buses, the lines and the links.
+    """
+    return shapely.union_all(gpd.read_file(fp_offshore_shapes)["geometry"].values)
+
+
 def add_underwater_links(n, fp_offshore_shapes):
     if not hasattr(n.links, "geometry"):
         n.links["underwater_fraction"] = 0.0
     else:
-        offshore_shape = gpd.read_file(fp_offshore_shapes).unary_union
+        offshore_shape = _load_offshore_shape(fp_offshore_shapes)
         if offshore_shape is None or offshore_shape.is_empty:
             n.links["underwater_fraction"] = 0.0
         else:
-            links = gpd.GeoSeries(n.links.geometry.dropna().map(shapely.wkt.loads))
+            links = gpd.GeoSeries.from_wkt(n.links.geometry.dropna())
             n.links["underwater_fraction"] = (
                 links.intersection(offshore_shape).length / links.length
             )
@@ -155,13 +168,11 @@ def _set_dc_underwater_fraction(lines_or_links, fp_offshore_shapes):
     if not hasattr(lines_or_links, "geometry"):
         lines_or_links["underwater_fraction"] = 0.0
     else:
-        offshore_shape = gpd.read_file(fp_offshore_shapes).unary_union
+        offshore_shape = _load_offshore_shape(fp_offshore_shapes)
         if offshore_shape is None or offshore_shape.is_empty:
             lines_or_links["underwater_fraction"] = 0.0
         else:
-            branches = gpd.GeoSeries(
-                lines_or_links.geometry.dropna().map(shapely.wkt.loads)
-            )
+            branches = gpd.GeoSeries.from_wkt(lines_or_links.geometry.dropna())
             # fix to avoid NaN for links during augmentation
             if branches.empty:
                 lines_or_links["underwater_fraction"] = 0
@@ -290,24 +301,24 @@ def _get_linetypes_config(line_types, voltages):
 
 def _get_linetype_by_voltage(v_nom, d_linetypes):
     """
-    Return the linetype of a specific line based on its voltage v_nom.
+    Return the linetype of the lines based on their voltage v_nom.
 
     Parameters
     ----------
-    v_nom : float
-        The voltage of the line.
+    v_nom : float or array-like
+        The voltage of the lines.
     d_linetypes : dict
         Dictionary of linetypes: keys are nominal voltages and values are linetypes.
 
     Returns
     -------
-        The linetype of the line whose nominal voltage is closest to the line voltage.
+        The linetype of the lines whose nominal voltage is closest to the line voltage.
     """
-    v_nom_min, line_type_min = min(
-        d_linetypes.items(),
-        key=lambda x: abs(x[0] - v_nom),
-    )
-    return line_type_min
+    v_noms = np.fromiter(d_linetypes.keys(), dtype=float)
+    line_types = np.array(list(d_linetypes.values()), dtype=object)
+    # distances of each line voltage to all nominal voltages, the first closest is kept
+    distances = np.abs(np.subtract.outer(np.asarray(v_nom, dtype=float), v_noms))
+    return line_types[distances.argmin(axis=-1)]
 
 
 def _set_electrical_parameters_lines(lines_config, voltages, lines):
@@ -320,9 +331,7 @@ def _set_electrical_parameters_lines(lines_config, voltages, lines):
     lines["carrier"] = "AC"
     lines["dc"] = False
 
-    lines.loc[:, "type"] = lines.v_nom.apply(
-        lambda x: _get_linetype_by_voltage(x, linetypes)
-    )
+    lines["type"] = _get_linetype_by_voltage(lines.v_nom, linetypes)
 
     lines["s_max_pu"] = lines_config["s_max_pu"]
 
@@ -338,9 +347,7 @@ def _set_electrical_parameters_dc_lines(lines_config, voltages, lines):
 
     lines["carrier"] = "DC"
     lines["dc"] = True
-    lines.loc[:, "type"] = lines.v_nom.apply(
-        lambda x: _get_linetype_by_voltage(x, linetypes)
-    )
+    lines["type"] = _get_linetype_by_voltage(lines.v_nom, linetypes)
 
     lines["s_max_pu"] = lines_config["s_max_pu"]
 
@@ -388,15 +395,11 @@ def _set_electrical_parameters_converters(links_config, converters):
 
 def _set_lines_s_nom_from_linetypes(n):
     # Info: n.line_types is a lineregister from pypsa/pandapowers
-    n.lines["s_nom"] = (
-        np.sqrt(3)
-        * n.lines["type"].map(n.line_types.i_nom)
-        * n.lines.eval("v_nom * num_parallel")
+    s_nom = n.lines["type"].map(n.line_types.i_nom) * n.lines.eval(
+        "v_nom * num_parallel"
     )
-    # Re-define s_nom for DC lines
-    n.lines.loc[n.lines["carrier"] == "DC", "s_nom"] = n.lines["type"].map(
-        n.line_types.i_nom
-    ) * n.lines.eval("v_nom * num_parallel")
+    # the sqrt(3) factor of three-phase AC does not apply to DC lines
+    n.lines["s_nom"] = s_nom.where(n.lines["carrier"] == "DC", np.sqrt(3) * s_nom)
 
 
 def _remove_dangling_branches(branches, buses):
@@ -409,7 +412,7 @@ def _set_countries_and_substations(inputs, base_network_config, countries_config
     countries = countries_config
     country_shapes = gpd.read_file(inputs.country_shapes).set_index("name")["geometry"]
 
-    offshore_shapes = unary_union(gpd.read_file(inputs.offshore_shapes)["geometry"])
+    offshore_shapes = _load_offshore_shape(inputs.offshore_shapes)
 
     buses = n.buses
     bus_locations = buses
@@ -517,10 +520,8 @@ def base_network(
     else:
         lines_dc = _set_electrical_parameters_links(links_config, lines_dc)
         # parse line information into p_nom required for converters
-        lines_dc["p_nom"] = lines_dc.apply(
-            lambda x: x["v_nom"] * n.line_types.i_nom[x["type"]],
-            axis=1,
-            result_type="reduce",
+        lines_dc["p_nom"] = (
+            lines_dc["v_nom"] * n.line_types.i_nom.loc[lines_dc["type"]].values
         )
         n.import_components_from_dataframe(lines_ac, "Line")
         # The columns which names starts with "bus" are mixed up with the third-bus specification
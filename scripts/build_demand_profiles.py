@@ -42,17 +42,16 @@ it returns a csv file called "demand_profiles.csv", that allocates the load to t
 """
 import os
 import os.path
-from itertools import product
 
 import geopandas as gpd
 import numpy as np
 import pandas as pd
 import pypsa
 import scipy.sparse as sparse
+import shapely
 import xarray as xr
 from _helpers import configure_logging, create_logger, read_csv_nafix, read_osm_config
-from shapely.prepared import prep
-from shapely.validation import make_valid
+from shapely import STRtree
 
 logger = create_logger(__name__)
 
@@ -143,13 +142,18 @@ def shapes_to_shapes(orig, dest):
     """
     Adopted from vresutils.transfer.Shapes2Shapes()
     """
-    orig_prepped = list(map(prep, orig))
-    transfer = sparse.lil_matrix((len(dest), len(orig)), dtype=float)
+    orig = np.asarray(orig)
+    dest = np.asarray(dest)
 
-    for i, j in product(range(len(dest)), range(len(orig))):
-        if orig_prepped[j].intersects(dest[i]):
-            area = orig[j].intersection(dest[i]).area
-            transfer[i, j] = area / dest[i].area
+    # intersecting pairs are found by a single query of the spatial index
+    # rather than by testing every (dest, orig) combination
+    dest_i, orig_j = STRtree(orig).query(dest, predicate="intersects")
+    area = shapely.area(shapely.intersection(orig[orig_j], dest[dest_i]))
+
+    transfer = sparse.csr_matrix(
+        (area / shapely.area(dest[dest_i]), (dest_i, orig_j)),
+        shape=(len(dest), len(orig)),
+    )
 
     return transfer
 
@@ -244,7 +248,9 @@ def build_demand_profiles(
         gegis_load["Electricity demand"] *= scale
 
     shapes = gpd.read_file(admin_shapes).set_index("GADM_ID")
-    shapes["geometry"] = shapes["geometry"].apply(lambda x: make_valid(x))
+    # only the invalid shapes are repaired, in a single vectorized call
+    invalid = ~shapes.geometry.is_valid
+    shapes.loc[invalid, "geometry"] = shapes.geometry[invalid].make_valid()
 
     def upsample(cntry, group):
         """
@@ -256,12 +262,9 @@ def build_demand_profiles(
         else:
             shapes_cntry = shapes.loc[shapes.country == cntry]
             transfer = shapes_to_shapes(group, shapes_cntry.geometry).T.tocsr()
-            gdp_n = pd.Series(
-                transfer.dot(shapes_cntry["gdp"].fillna(1.0).values), index=group.index
-            )
-            pop_n = pd.Series(
-                transfer.dot(shapes_cntry["pop"].fillna(1.0).values), index=group.index
-            )
+            # gdp and pop are kept as numpy arrays aligned with group.index
+            gdp_n = transfer.dot(shapes_cntry["gdp"].fillna(1.0).to_numpy())
+            pop_n = transfer.dot(shapes_cntry["pop"].fillna(1.0).to_numpy())
 
             # relative factors 0.6 and 0.4 have been determined from a linear
             # regression on the country to EU continent load data
@@ -269,9 +272,9 @@ def build_demand_profiles(
             # TODO: require adjustment for Africa
             factors = normed(0.6 * normed(gdp_n) + 0.4 * normed(pop_n))
             return pd.DataFrame(
-                factors.values * l.values[:, np.newaxis],
+                factors * l.values[:, np.newaxis],
                 index=l.index,
-                columns=factors.index,
+                columns=group.index,
             )
 
     demand_profiles = pd.concat(
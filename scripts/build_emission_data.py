@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# SPDX-FileCopyrightText:  PyPSA-Earth and PyPSA-Eur Authors
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+# -*- coding: utf-8 -*-
+"""
+Retrieves the EDGAR CO2 emissions and extracts the emissions of public
+electricity and heat production by country.
+
+Relevant Settings
+-----------------
+
+.. code:: yaml
+
+    electricity:
+        automatic_emission:
+
+.. seealso::
+    Documentation of the configuration file ``config.yaml`` at
+    :ref:`electricity_cf`
+
+Inputs
+------
+
+- ``data/v60_CO2_excl_short-cycle_org_C_1970_2018.xls``: `EDGAR <https://edgar.jrc.ec.europa.eu/>`_ CO2 emissions by country and sector, downloaded when missing.
+
+Outputs
+-------
+
+- ``resources/edgar_co2.csv``: CO2 emissions of public electricity and heat production by ISO3 country code for the years 1970 to 2018.
+
+Description
+-----------
+
+The EDGAR spreadsheet is parsed once into a table that is read by the
+:mod:`prepare_network` jobs which set the CO2 limit from the emissions of a
+base year, i.e. when ``automatic_emission`` is enabled.
+"""
+import os
+import shutil
+from zipfile import BadZipFile, ZipFile
+
+import pandas as pd
+import requests
+from _helpers import configure_logging, create_logger
+
+logger = create_logger(__name__)
+
+
+def download_emission_data():
+    """
+    Download emission file from EDGAR.
+
+    Returns
+    -------
+    global emission file for all countries in the world.
+    """
+    filename = "v60_CO2_excl_short-cycle_org_C_1970_2018.xls"
+    rootpath = os.getcwd()
+    file_path = os.path.join(rootpath, "data", filename)
+
+    # the emission file does not change, so it is downloaded only once
+    if os.path.isfile(file_path):
+        return filename
+
+    url = "https://jeodpp.jrc.ec.europa.eu/ftp/jrc-opendata/EDGAR/datasets/v60_GHG/CO2_excl_short-cycle_org_C/v60_GHG_CO2_excl_short-cycle_org_C_1970_2018.zip"
+    zip_path = os.path.join(rootpath, "data", "co2.zip")
+    tmp_path = f"{file_path}.tmp"
+    try:
+        with requests.get(url, stream=True, timeout=60) as rq:
+            rq.raise_for_status()
+            with open(zip_path, "wb") as file:
+                for chunk in rq.iter_content(chunk_size=1024 * 1024):
+                    file.write(chunk)
+        # extract to a temporary name and rename it when complete, so that an
+        # interrupted extraction is not taken for the emission file next time
+        with ZipFile(zip_path, "r") as zipObj:
+            with zipObj.open(filename) as src, open(tmp_path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, file_path)
+        return filename
+    except (requests.RequestException, OSError, BadZipFile, KeyError) as e:
+        logger.error(f"Failed download resource from '{url}': {e}")
+        return False
+    finally:
+        for path in (zip_path, tmp_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def parse_emission_data(filename):
+    """
+    Parses the CO2 emissions of public electricity and heat production from
+    the global emission file.
+
+    Parameters
+    ----------
+    filename : str
+        Global emission filename
+
+    Returns
+    -------
+    CO2 emission values by ISO3 country code and year.
+    """
+    datapath = os.path.join(os.getcwd(), "data", filename)
+    df = pd.read_excel(datapath, sheet_name="v6.0_EM_CO2_fossil_IPCC1996", skiprows=8)
+    df.columns = df.iloc[0]
+    df = df.set_index("Country_code_A3")
+    df = df.loc[
+        df["IPCC_for_std_report_desc"] == "Public electricity and heat production"
+    ]
+    return df.loc[:, "Y_1970":"Y_2018"].astype(float).ffill(axis=1).bfill(axis=1)
+
+
+if __name__ == "__main__":
+    if "snakemake" not in globals():
+        from _helpers import mock_snakemake
+
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        snakemake = mock_snakemake("build_emission_data")
+    configure_logging(snakemake)
+
+    filename = download_emission_data()
+    if not filename:
+        raise FileNotFoundError("The EDGAR emission file could not be retrieved.")
+
+    parse_emission_data(filename).to_csv(snakemake.output[0])
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# SPDX-FileCopyrightText:  PyPSA-Earth and PyPSA-Eur Authors
+#
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+# -*- coding: utf-8 -*-
+"""
+Creates the monte-carlo experimental design shared by all the {unc} networks.
+
+Relevant Settings
+-----------------
+
+.. code:: yaml
+
+    monte_carlo:
+    options:
+        samples:
+        sampling_strategy:
+        seed:
+    uncertainties:
+
+.. seealso::
+    Documentation of the configuration file ``config.yaml`` at :ref:`monte_cf`
+
+Inputs
+------
+None
+
+Outputs
+-------
+- ``resources/monte_carlo/experimental_design.npy``: experimental design of the dimension (samples X features), whose rows hold the scaling factors of the features in each {unc} scenario
+
+Description
+-----------
+The experimental design is sampled once with the strategy of the monte_carlo config
+and loaded by each :mod:`monte_carlo` job, so that all the {unc} networks are drawn
+from the same design. As a Snakemake output, it is rebuilt whenever the monte_carlo
+config changes.
+"""
+import os
+
+import numpy as np
+from _helpers import configure_logging, create_logger
+from monte_carlo import create_experimental_design, validate_parameters
+
+logger = create_logger(__name__)
+
+
+if __name__ == "__main__":
+    if "snakemake" not in globals():
+        from _helpers import mock_snakemake
+
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        snakemake = mock_snakemake("build_monte_carlo_design")
+    configure_logging(snakemake)
+    monte_carlo_config = snakemake.params.monte_carlo
+
+    MONTE_CARLO_PYPSA_FEATURES = [
+        k for k in monte_carlo_config["uncertainties"].keys() if k
+    ]  # removes key value pairs with empty value e.g. []
+    MONTE_CARLO_OPTIONS = monte_carlo_config["options"]
+    N_FEATURES = len(MONTE_CARLO_PYPSA_FEATURES)
+    SAMPLES = MONTE_CARLO_OPTIONS.get(
+        "samples"
+    )  # TODO: What is the optimal sampling? Fabian Neumann answered that in "Broad ranges" paper
+    SAMPLING_STRATEGY = MONTE_CARLO_OPTIONS.get("sampling_strategy", "scipy")
+    UNCERTAINTIES_VALUES = monte_carlo_config["uncertainties"].values()
+    SEED = MONTE_CARLO_OPTIONS.get("seed")
+
+    # validates the parameters supplied from config file
+    validate_parameters(SAMPLING_STRATEGY, SAMPLES, UNCERTAINTIES_VALUES)
+
+    lh = create_experimental_design(
+        SAMPLING_STRATEGY, N_FEATURES, SAMPLES, UNCERTAINTIES_VALUES, SEED
+    )
+    np.save(snakemake.output[0], lh)
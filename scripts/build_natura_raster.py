@@ -120,7 +120,7 @@ def unify_protected_shape_areas(inputs, natura_crs, out_logging):
     unified_shape : GeoDataFrame with a unified "multishape"
     """
     import pandas as pd
-    from shapely.ops import unary_union
+    import shapely
     from shapely.validation import make_valid
 
     if out_logging:
@@ -149,8 +149,8 @@ def unify_protected_shape_areas(inputs, natura_crs, out_logging):
         except:
             logger.warning(f"Error reading file {i}")
 
-    # merge dataframes
-    shape = gpd.GeoDataFrame(pd.concat(list_shapes)).to_crs(natura_crs)
+    # merge dataframes, all the shapes have already been projected to natura_crs
+    shape = gpd.GeoDataFrame(pd.concat(list_shapes), crs=natura_crs)
 
     logger.info(f"Read {read_files} out of {total_files} landcover files")
 
@@ -164,7 +164,7 @@ def unify_protected_shape_areas(inputs, natura_crs, out_logging):
     # Unary_union makes out of i.e. 1000 shapes -> 1 unified shape
     if out_logging:
         logger.info("Stage 3/5: Unify protected shape area. Step 2: Unify all shapes")
-    unified_shape_file = unary_union(shape["geometry"])
+    unified_shape_file = shapely.union_all(shape["geometry"].values)
     if out_logging:
         logger.info(
             "Stage 3/5: Unify protected shape area. Step 3: Set geometry of unified shape"
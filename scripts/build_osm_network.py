@@ -10,6 +10,7 @@ import os
 import geopandas as gpd
 import numpy as np
 import pandas as pd
+import shapely
 from _helpers import (
     configure_logging,
     create_logger,
@@ -18,6 +19,7 @@ from _helpers import (
     sets_path_to_root,
     to_csv_nafix,
 )
+from scipy.spatial import cKDTree as KDTree
 from shapely.geometry import LineString, Point
 from shapely.ops import linemerge, split
 from tqdm import tqdm
@@ -30,14 +32,18 @@ def line_endings_to_bus_conversion(lines):
 
     lines["bounds"] = lines["geometry"].boundary  # create start and end point
 
-    lines["bus_0_coors"] = lines["bounds"].map(lambda p: p.geoms[0])
-    lines["bus_1_coors"] = lines["bounds"].map(lambda p: p.geoms[1])
+    # the end points are extracted from all the boundaries at once
+    bounds = lines["bounds"].values
+    bus_0_coors = shapely.get_geometry(bounds, 0)
+    bus_1_coors = shapely.get_geometry(bounds, 1)
+    lines["bus_0_coors"] = gpd.GeoSeries(bus_0_coors, index=lines.index, crs=lines.crs)
+    lines["bus_1_coors"] = gpd.GeoSeries(bus_1_coors, index=lines.index, crs=lines.crs)
 
     # splits into coordinates
-    lines["bus0_lon"] = lines["bus_0_coors"].x
-    lines["bus0_lat"] = lines["bus_0_coors"].y
-    lines["bus1_lon"] = lines["bus_1_coors"].x
-    lines["bus1_lat"] = lines["bus_1_coors"].y
+    lines["bus0_lon"] = shapely.get_x(bus_0_coors)
+    lines["bus0_lat"] = shapely.get_y(bus_0_coors)
+    lines["bus1_lon"] = shapely.get_x(bus_1_coors)
+    lines["bus1_lat"] = shapely.get_y(bus_1_coors)
 
     return lines
 
@@ -64,6 +70,13 @@ def set_substations_ids(buses, distance_crs, tol=2000):
     # create temporary series to execute distance calculations using m as reference distances
     temp_bus_geom = buses.geometry.to_crs(distance_crs)
 
+    # substations within tolerance of each substation, found at once by a
+    # KDTree instead of computing the distances to all substations per bus
+    bus_coords = np.column_stack([temp_bus_geom.x, temp_bus_geom.y])
+    close_nodes_by_bus = KDTree(bus_coords).query_ball_point(
+        bus_coords, r=tol, return_sorted=True
+    )
+
     # set tqdm options for substation ids
     tqdm_kwargs_substation_ids = dict(
         ascii=False,
@@ -78,9 +91,7 @@ def set_substations_ids(buses, distance_crs, tol=2000):
             continue
 
         # get substations within tolerance
-        close_nodes = np.flatnonzero(
-            temp_bus_geom.distance(temp_bus_geom.loc[i]) <= tol
-        )
+        close_nodes = np.asarray(close_nodes_by_bus[buses.index.get_loc(i)])
 
         if len(close_nodes) == 1:
             # if only one substation is in tolerance, then the substation is the current one iì
@@ -126,22 +137,24 @@ def set_lines_ids(lines, buses, distance_crs):
         desc="Set line bus ids ",
     )
 
-    # initialization
-    lines["bus0"] = -1
-    lines["bus1"] = -1
-
     busesepsg = buses.to_crs(distance_crs)
     linesepsg = lines.to_crs(distance_crs)
 
+    # bus ids and geometries are collected per line and assigned once at the end
+    bus0_ids = []
+    bus1_ids = []
+    line_geometries = []
+
     for i, row in tqdm(linesepsg.iterrows(), **tqdm_kwargs_line_ids):
         # select buses having the voltage level of the current line
         buses_sel = busesepsg[
             (buses["voltage"] == row["voltage"]) & (buses["dc"] == row["dc"])
         ]
+        line_geometry = lines.at[i, "geometry"]
 
         # find the closest node of the bus0 of the line
         bus0_id = buses_sel.geometry.distance(row.geometry.boundary.geoms[0]).idxmin()
-        lines.loc[i, "bus0"] = buses.loc[bus0_id, "bus_id"]
+        bus0_ids.append(buses.loc[bus0_id, "bus_id"])
 
         # check if the line starts exactly in the node, otherwise modify the linestring
         distance_bus0 = busesepsg.geometry.loc[bus0_id].distance(
@@ -149,21 +162,21 @@ def set_lines_ids(lines, buses, distance_crs):
         )
         if distance_bus0 > 0.0:
             # the line does not start in the node, thus modify the linestring
-            lines.loc[i, "geometry"] = linemerge(
+            line_geometry = linemerge(
                 [
                     LineString(
                         [
                             buses.loc[bus0_id, "geometry"],
-                            lines.loc[i, "geometry"].boundary.geoms[0],
+                            line_geometry.boundary.geoms[0],
                         ]
                     ),
-                    lines.loc[i, "geometry"],
+                    line_geometry,
                 ]
             )
 
         # find the closest node of the bus1 of the line
         bus1_id = buses_sel.geometry.distance(row.geometry.boundary.geoms[1]).idxmin()
-        lines.loc[i, "bus1"] = buses.loc[bus1_id, "bus_id"]
+        bus1_ids.append(buses.loc[bus1_id, "bus_id"])
 
         # check if the line ends exactly in the node, otherwise modify the linestring
         distance_bus1 = busesepsg.geometry.loc[bus1_id].distance(
@@ -171,18 +184,24 @@ def set_lines_ids(lines, buses, distance_crs):
         )
         if distance_bus1 > 0.0:
             # the line does not end in the node, thus modify the linestring
-            lines.loc[i, "geometry"] = linemerge(
+            line_geometry = linemerge(
                 [
-                    lines.loc[i, "geometry"],
+                    line_geometry,
                     LineString(
                         [
-                            lines.loc[i, "geometry"].boundary.geoms[1],
+                            line_geometry.boundary.geoms[1],
                             buses.loc[bus1_id, "geometry"],
                         ]
                     ),
                 ]
             )
 
+        line_geometries.append(line_geometry)
+
+    lines["bus0"] = bus0_ids
+    lines["bus1"] = bus1_ids
+    lines["geometry"] = gpd.GeoSeries(line_geometries, index=lines.index, crs=lines.crs)
+
     return lines, buses
 
 
@@ -405,16 +424,21 @@ def connect_stations_same_station_id(lines, buses):
     substation_id.
     """
     ac_freq = get_ac_frequency(lines)
-    station_id_list = buses.station_id.unique()
 
     add_lines = []
     from shapely.geometry import LineString
 
-    for s_id in station_id_list:
-        buses_station_id = buses[buses.station_id == s_id]
-
+    # buses are grouped by station once, rather than filtered for every station
+    for s_id, buses_station_id in buses.groupby("station_id", sort=False):
         if len(buses_station_id) > 1:
             for b_it in range(1, len(buses_station_id)):
+                # the fake link geometry is built once for geometry and bounds
+                link_geometry = LineString(
+                    [
+                        buses_station_id.geometry.iloc[0],
+                        buses_station_id.geometry.iloc[b_it],
+                    ]
+                )
                 add_lines.append(
                     [
                         f"link{buses_station_id}_{b_it}",  # "line_id"
@@ -428,18 +452,8 @@ def connect_stations_same_station_id(lines, buses):
                         "transmission",  # "tag_type"
                         ac_freq,  # "tag_frequency"
                         buses_station_id.country.iloc[0],  # "country"
-                        LineString(
-                            [
-                                buses_station_id.geometry.iloc[0],
-                                buses_station_id.geometry.iloc[b_it],
-                            ]
-                        ),  # "geometry"
-                        LineString(
-                            [
-                                buses_station_id.geometry.iloc[0],
-                                buses_station_id.geometry.iloc[b_it],
-                            ]
-                        ).bounds,  # "bounds"
+                        link_geometry,  # "geometry"
+                        link_geometry.bounds,  # "bounds"
                         buses_station_id.geometry.iloc[0],  # "bus_0_coors"
                         buses_station_id.geometry.iloc[b_it],  # "bus_1_coors"
                         buses_station_id.lon.iloc[0],  # "bus0_lon"
@@ -766,12 +780,14 @@ def add_buses_to_empty_countries(country_list, fp_country_shapes, buses):
             .to_crs(geo_crs)
         )
         length = len(no_data_countries)
+        # the centroids are computed once for the coordinates and the geometry
+        centroids = no_data_countries_shape["geometry"].centroid
         df = gpd.GeoDataFrame(
             {
                 "voltage": [220000] * length,
                 "country": no_data_countries_shape["name"],
-                "lon": no_data_countries_shape["geometry"].centroid.x,
-                "lat": no_data_countries_shape["geometry"].centroid.y,
+                "lon": centroids.x,
+                "lat": centroids.y,
                 "bus_id": np.arange(len(buses) + 1, len(buses) + (length + 1), 1),
                 "station_id": [np.nan] * length,
                 # All lines for the countries with NA bus data are assumed to be AC
@@ -780,7 +796,7 @@ def add_buses_to_empty_countries(country_list, fp_country_shapes, buses):
                 "tag_area": [0.0] * length,
                 "symbol": ["substation"] * length,
                 "tag_substation": ["transmission"] * length,
-                "geometry": no_data_countries_shape["geometry"].centroid,
+                "geometry": centroids,
                 "substation_lv": [True] * length,
             },
             crs=geo_crs,
@@ -111,12 +111,12 @@ import yaml
 from _helpers import (
     configure_logging,
     create_logger,
+    locate_bus,
     read_csv_nafix,
     to_csv_nafix,
     two_digits_2_name_country,
 )
 from scipy.spatial import cKDTree as KDTree
-from shapely.geometry import Point
 
 logger = create_logger(__name__)
 
@@ -208,17 +208,19 @@ def convert_osm_to_pm(filepath_ppl_osm, filepath_ppl_pm):
     # All Hydro objects can be interpreted by PPM as Storages, too
     # However, everything extracted from OSM seems to belong
     # to power plants with "tags.power" == "generator" only
-    osm_ppm_df = pd.DataFrame(
-        data={
-            "osm_method": ["run-of-the-river", "water-pumped-storage", "water-storage"],
-            "ppm_technology": ["Run-Of-River", "Pumped Storage", "Reservoir"],
-        }
+    osm_ppm_technology = {
+        "run-of-the-river": "Run-Of-River",
+        "water-pumped-storage": "Pumped Storage",
+        "water-storage": "Reservoir",
+    }
+    # the mapping is applied on the few categories rather than on every row
+    ppm_technology = (
+        add_ppls["tags.generator:method"]
+        .astype("category")
+        .map(osm_ppm_technology)
+        .astype(object)
     )
-    for i in osm_ppm_df.index:
-        add_ppls.loc[
-            add_ppls["tags.generator:method"] == osm_ppm_df.loc[i, "osm_method"],
-            "Technology",
-        ] = osm_ppm_df.loc[i, "ppm_technology"]
+    add_ppls["Technology"] = ppm_technology.fillna(add_ppls["Technology"])
 
     # originates from osm::"tags.generator:source"
     add_ppls.loc[add_ppls["Fueltype"] == "Nuclear", "Technology"] = "Steam Turbine"
@@ -376,26 +378,8 @@ if __name__ == "__main__":
 
         gdf = gpd.read_file(snakemake.input.gadm_shapes)
 
-        def locate_bus(coords, co):
-            gdf_co = gdf[gdf["GADM_ID"].str.contains(co)]
-
-            point = Point(coords["lon"], coords["lat"])
-
-            try:
-                return gdf_co[gdf_co.contains(point)][
-                    "GADM_ID"
-                ].item()  # filter gdf_co which contains point and returns the bus
-
-            except ValueError:
-                return gdf_co[
-                    gdf_co.geometry == min(gdf_co.geometry, key=(point.distance))
-                ][
-                    "GADM_ID"
-                ].item()  # looks for closest one shape=node
-                # fixing https://github.com/pypsa-meets-earth/pypsa-earth/pull/670
-
-        ppl["region_id"] = ppl[["lon", "lat", "Country"]].apply(
-            lambda pp: locate_bus(pp[["lon", "lat"]], pp["Country"]), axis=1
+        ppl["region_id"] = locate_bus(
+            ppl, gdf, col_x="lon", col_y="lat", col_country="Country"
         )
 
     ppl.to_csv(snakemake.output.powerplants)
@@ -201,12 +201,14 @@ import geopandas as gpd
 import numpy as np
 import pandas as pd
 import progressbar as pgb
+import shapely
 import xarray as xr
 from _helpers import configure_logging, create_logger, sets_path_to_root
 from add_electricity import load_powerplants
 from dask.distributed import Client, LocalCluster
 from pypsa.geo import haversine
-from shapely.geometry import LineString, Point, box
+from shapely import STRtree
+from shapely.geometry import LineString, box
 
 cc = coco.CountryConverter()
 
@@ -589,11 +591,14 @@ if __name__ == "__main__":
         bus_to_consider = regions.index[filter_bus_to_consider]
 
         # identify subset of buses within the hydrobasins
-        filter_bus_in_hydrobasins = regions[filter_bus_to_consider].apply(
-            lambda row: any(hydrobasins.geometry.contains(Point(row["x"], row["y"]))),
-            axis=1,
+        # a single query of the spatial index replaces testing every bus
+        # against every hydrobasin
+        regions_to_consider = regions[filter_bus_to_consider]
+        bus_points = shapely.points(regions_to_consider["x"], regions_to_consider["y"])
+        bus_i, _ = STRtree(hydrobasins.geometry.values).query(
+            bus_points, predicate="within"
         )
-        bus_in_hydrobasins = filter_bus_in_hydrobasins[filter_bus_in_hydrobasins].index
+        bus_in_hydrobasins = regions_to_consider.index[np.unique(bus_i)]
 
         bus_notin_hydrobasins = list(
             set(bus_to_consider).difference(set(bus_in_hydrobasins))
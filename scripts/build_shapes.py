@@ -17,22 +17,19 @@ import numpy as np
 import pandas as pd
 import rasterio
 import requests
+import shapely
 import xarray as xr
 from _helpers import (
     configure_logging,
     create_logger,
     sets_path_to_root,
-    three_2_two_digits_country,
     two_2_three_digits_country,
     two_digits_2_name_country,
 )
 from numba import njit
-from numba.core import types
-from numba.typed import Dict
 from rasterio.mask import mask
 from rasterio.windows import Window
 from shapely.geometry import MultiPolygon
-from shapely.ops import unary_union
 from shapely.validation import make_valid
 from tqdm import tqdm
 
@@ -285,12 +282,12 @@ def country_cover(country_shapes, eez_shapes=None, out_logging=False, distance=0
     if out_logging:
         logger.info("Stage 3 of 5: Merge country shapes to create continent shape")
 
-    shapes = country_shapes.apply(lambda x: x.buffer(distance))
-    shapes_list = list(shapes)
+    # buffer and union operate on the whole geometry arrays
+    shapes = np.asarray(country_shapes.buffer(distance))
     if eez_shapes is not None:
-        shapes_list += list(eez_shapes)
+        shapes = np.concatenate([shapes, np.asarray(eez_shapes)])
 
-    africa_shape = make_valid(unary_union(shapes_list))
+    africa_shape = make_valid(shapely.union_all(shapes))
 
     return africa_shape
 
@@ -328,15 +325,13 @@ def load_EEZ(countries_codes, geo_crs, EEZ_gpkg="./data/eez/eez_v11.gpkg"):
     geodf_EEZ.dropna(axis=0, how="any", subset=["ISO_TER1"], inplace=True)
     # [["ISO_TER1", "TERRITORY1", "ISO_SOV1", "ISO_SOV2", "ISO_SOV3", "geometry"]]
     geodf_EEZ = geodf_EEZ[["ISO_TER1", "geometry"]]
-    selected_countries_codes_3D = [
-        two_2_three_digits_country(x) for x in countries_codes
-    ]
-    geodf_EEZ = geodf_EEZ[
-        [any([x in selected_countries_codes_3D]) for x in geodf_EEZ["ISO_TER1"]]
-    ]
-    geodf_EEZ["ISO_TER1"] = geodf_EEZ["ISO_TER1"].map(
-        lambda x: three_2_two_digits_country(x)
-    )
+    # the country codes are converted once per selected country
+    # rather than once per EEZ shape
+    three_2_two_digits_dict = {
+        two_2_three_digits_country(x): x for x in countries_codes
+    }
+    geodf_EEZ = geodf_EEZ[geodf_EEZ["ISO_TER1"].isin(list(three_2_two_digits_dict))]
+    geodf_EEZ["ISO_TER1"] = geodf_EEZ["ISO_TER1"].map(three_2_two_digits_dict)
     geodf_EEZ.reset_index(drop=True, inplace=True)
 
     geodf_EEZ.rename(columns={"ISO_TER1": "name"}, inplace=True)
@@ -366,14 +361,13 @@ def eez(
     # load data
     df_eez = load_EEZ(countries, geo_crs, EEZ_gpkg)
 
-    eez_countries = [cc for cc in countries if df_eez.name.str.contains(cc).any()]
+    # merge the EEZ shapes of each country with a single groupby on the country code
+    eez_by_country = df_eez.dissolve(by="name").geometry
+    eez_countries = [cc for cc in countries if cc in eez_by_country.index]
     ret_df = gpd.GeoDataFrame(
         {
             "name": eez_countries,
-            "geometry": [
-                df_eez.geometry.loc[df_eez.name == cc].geometry.unary_union
-                for cc in eez_countries
-            ],
+            "geometry": list(eez_by_country.loc[eez_countries]),
         }
     ).set_index("name")
 
@@ -691,24 +685,47 @@ def add_gdp_data(
     if out_logging:
         logger.info("Stage 5 of 5: Add gdp data to GADM GeoDataFrame")
 
-    # initialize new gdp column
-    df_gadm["gdp"] = 0.0
-
     GDP_tif, name_tif = load_GDP(year, update, out_logging, name_file_nc)
 
-    with rasterio.open(GDP_tif) as src:
-        # resample data to target shape
-        tqdm_kwargs = dict(
-            ascii=False,
-            unit=" geometries",
-            total=df_gadm.shape[0],
-            desc="Compute GDP ",
+    # resample data to target shape
+    tqdm_kwargs = dict(
+        ascii=False,
+        unit=" geometries",
+        total=df_gadm.shape[0],
+        desc="Compute GDP ",
+        disable=disable_progressbar,
+    )
+    kwargs = {
+        "initializer": _init_process_gdp,
+        "initargs": (GDP_tif,),
+        "processes": nprocesses,
+    }
+    # the shapes are independent, hence they are distributed over the processes;
+    # imap preserves the order and the gdp column is assigned once
+    with mp.get_context("spawn").Pool(**kwargs) as pool:
+        gdp = list(
+            tqdm(
+                pool.imap(process_function_gdp, df_gadm.geometry, chunksize=16),
+                **tqdm_kwargs,
+            )
         )
-        for i in tqdm(df_gadm.index, **tqdm_kwargs):
-            df_gadm.loc[i, "gdp"] = _sum_raster_over_mask(df_gadm.geometry.loc[i], src)
+    df_gadm["gdp"] = np.array(gdp, dtype=float)
     return df_gadm
 
 
+def _init_process_gdp(GDP_tif_):
+    global GDP_src
+    GDP_src = rasterio.open(GDP_tif_)
+
+
+def process_function_gdp(geometry):
+    """
+    Function that sums the gdp raster, opened once per process, within the
+    given geometry.
+    """
+    return _sum_raster_over_mask(geometry, GDP_src)
+
+
 def _init_process_pop(df_gadm_, df_tasks_, dict_worldpop_file_locations_):
     global df_gadm, df_tasks
     df_gadm, df_tasks = df_gadm_, df_tasks_
@@ -907,24 +924,18 @@ def sum_values_using_geomask(np_pop_val, np_pop_xy, region_geomask, id_mapping):
             - "GADM_ID"
             - "pop" containing population of GADM_ID region
     """
-    # Initialize a dictionary
-    dict_id = Dict.empty(
-        key_type=types.int64,
-        value_type=types.int64,
-    )
-    dict_id[0] = 0
-    counter = 1
-    # Loop over ip mapping and add indices to the dictionary
-    for ID_index in np.array(id_mapping.index):
-        dict_id[ID_index] = counter
-        counter += 1
+    # Map each geomask id to its location in np_pop_count through a dense
+    # lookup array, as ids are small integers (uint16) by construction
+    np_id_index = np.array(id_mapping.index, dtype=np.int64)
+    np_id_lookup = np.zeros(np_id_index.max() + 1, dtype=np.int64)
+    np_id_lookup[np_id_index] = np.arange(1, len(np_id_index) + 1)
 
     # Declare an array to contain population counts
     np_pop_count = np.zeros(len(id_mapping) + 1)
 
     # Calculate population count of region using a numba njit compiled function
     np_pop_count = loop_and_extact_val_x_y(
-        np_pop_count, np_pop_val, np_pop_xy, region_geomask, dict_id
+        np_pop_count, np_pop_val, np_pop_xy, region_geomask, np_id_lookup
     )
 
     df_pop_count = pd.DataFrame(np_pop_count, columns=["pop"])
@@ -936,13 +947,13 @@ def sum_values_using_geomask(np_pop_val, np_pop_xy, region_geomask, id_mapping):
 
 @njit
 def loop_and_extact_val_x_y(
-    np_pop_count, np_pop_val, np_pop_xy, region_geomask, dict_id
+    np_pop_count, np_pop_val, np_pop_xy, region_geomask, np_id_lookup
 ):
     """
     Function that will be compiled using @njit (numba) It takes all the
     population values from np_pop_val and stores them in np_pop_count.
 
-    where each location in np_pop_count is mapped to a GADM_ID through dict_id (id_mapping by extension)
+    where each location in np_pop_count is mapped to a GADM_ID through np_id_lookup (id_mapping by extension)
 
     Inputs:
     -------
@@ -950,7 +961,7 @@ def loop_and_extact_val_x_y(
         np_pop_val: array filled with values for each nonzero pixel in the worldpop file
         np_pop_xy: array with [x,y] coordinates of the corresponding nonzero values in np_pop_valid
         region_geomask: array with dimensions of window, values are keys that map to GADM_ID using id_mapping
-        dict_id: numba typed.dict containing id_mapping.index -> location in np_pop_count
+        np_id_lookup: np.array indexed by the region_geomask keys containing the location in np_pop_count
 
     Outputs:
     --------
@@ -965,7 +976,7 @@ def loop_and_extact_val_x_y(
         cur_id = region_geomask[int(cur_x)][int(cur_y)]
 
         # Add the current value to the population
-        np_pop_count[dict_id[cur_id]] += cur_value
+        np_pop_count[np_id_lookup[cur_id]] += cur_value
 
     return np_pop_count
 
@@ -1216,6 +1227,8 @@ def add_population_data(
         ),
         "processes": nprocesses,
     }
+    # List to collect the population count of each window
+    list_pop_count = []
     # Spawn processes with the parameters from kwargs
     with mp.get_context("spawn").Pool(**kwargs) as pool:
         # Create a progress bar
@@ -1224,17 +1237,20 @@ def add_population_data(
             for df_pop_count in pool.imap_unordered(
                 process_function_population, range(len(df_tasks))
             ):
-                # Acquire the lock before accessing df_gadm and pbar
+                # Acquire the lock before accessing list_pop_count and pbar
                 with lock:
-                    # Loop the regions and write population to df_gadm
-                    for i in range(len(df_pop_count)):
-                        gadm_id, pop_count = df_pop_count.iloc[i]
-                        # Select the row with the same "GADM_ID" and set the population count
-                        df_gadm.loc[df_gadm["GADM_ID"] == gadm_id, "pop"] += pop_count
+                    # windows without population return an empty list
+                    if len(df_pop_count) > 0:
+                        list_pop_count.append(df_pop_count)
 
                     # update bar
                     pbar.update(1)
 
+    # Sum the population of all windows by GADM_ID and write it to df_gadm once
+    if list_pop_count:
+        pop_by_gadm_id = pd.concat(list_pop_count).groupby("GADM_ID")["pop"].sum()
+        df_gadm["pop"] += df_gadm["GADM_ID"].map(pop_by_gadm_id).fillna(0.0)
+
 
 def gadm(
     worldpop_method,
@@ -1288,6 +1304,7 @@ def gadm(
             update,
             out_logging,
             name_file_nc="GDP_PPP_1990_2015_5arcmin_v2.nc",
+            nprocesses=nprocesses,
         )
 
     # renaming 3 letter to 2 letter ISO code before saving GADM file
@@ -1298,9 +1315,8 @@ def gadm(
     )
     df_gadm.set_index("GADM_ID", inplace=True)
     df_gadm["geometry"] = df_gadm["geometry"].map(_simplify_polys)
-    df_gadm.geometry = df_gadm.geometry.apply(
-        lambda r: make_valid(r) if not r.is_valid else r
-    )
+    invalid = ~df_gadm.geometry.is_valid
+    df_gadm.loc[invalid, "geometry"] = df_gadm.geometry[invalid].make_valid()
     df_gadm = df_gadm[df_gadm.geometry.is_valid & ~df_gadm.geometry.is_empty]
 
     return df_gadm
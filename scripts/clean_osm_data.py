@@ -18,6 +18,7 @@ from _helpers import (
     save_to_geojson,
     to_csv_nafix,
 )
+from shapely import STRtree
 
 logger = create_logger(__name__)
 
@@ -581,21 +582,18 @@ def fill_circuits(df):
 
     # length of cables match the frequency one
     # matching uses directly only the cables series
+    # the elements of all the rows are exploded and parsed at once
     df_match_by_cables = df[to_fill_direct][["tag_frequency", "cables"]].copy()
-    df_match_by_cables["cables"] = (
-        df_match_by_cables["cables"].astype(str).str.split(";")
+    match_cables = df_match_by_cables["cables"].astype(str).str.split(";").explode()
+    match_frequency = df_match_by_cables["tag_frequency"].explode()
+    match_circuits = pd.Series(
+        match_cables.where(match_cables.str.isnumeric(), "0").astype(float).values
+        / match_frequency.map(cables_req).fillna(2).values,
+        index=match_cables.index,
     )
 
-    def _filter_cables(row):
-        return ";".join(
-            [
-                str(_parse_float(vc) / _basic_cables(vf))
-                for (vc, vf) in zip(row["cables"], row["tag_frequency"])
-            ]
-        )
-
-    df.loc[df_match_by_cables.index, "circuits"] = df_match_by_cables.apply(
-        _filter_cables, axis=1
+    df.loc[df_match_by_cables.index, "circuits"] = (
+        match_circuits.astype(str).groupby(level=0, sort=False).agg(";".join)
     )
 
     # length of cables elements is larger than frequency; the last cable data are merged to match
@@ -603,9 +601,11 @@ def fill_circuits(df):
     df_merge_by_cables["cables"] = (
         df_merge_by_cables["cables"].astype(str).str.split(";")
     )
+    # the frequency lengths are already known from the circuits status
+    df_merge_by_cables["len_f"] = len_f[to_fill_merge]
 
     def _parse_cables_to_len(row):
-        lf = len(row["tag_frequency"])
+        lf = row["len_f"]
         float_cable = [_parse_float(vc) for vc in row["cables"]]
         parsed_cable_list = float_cable[0 : lf - 1] + [sum(float_cable[lf - 1 :])]
 
@@ -771,16 +771,6 @@ def prepare_generators_df(df_all_generators):
     return df_all_generators
 
 
-def find_first_overlap(geom, country_geoms, default_name):
-    """
-    Return the first index whose shape intersects the geometry.
-    """
-    for c_name, c_geom in country_geoms.items():
-        if not geom.disjoint(c_geom):
-            return c_name
-    return default_name
-
-
 def set_countryname_by_shape(
     df,
     ext_country_shapes,
@@ -788,14 +778,20 @@ def set_countryname_by_shape(
     col_country="country",
 ):
     "Set the country name by the name shape"
-    df[col_country] = [
-        find_first_overlap(
-            row["geometry"],
-            ext_country_shapes,
-            None if exclude_external else row[col_country],
-        )
-        for id, row in df.iterrows()
-    ]
+    # a single query of the spatial index finds all the intersecting shapes;
+    # the first one in the order of ext_country_shapes is kept for each row
+    geom_i, shape_i = STRtree(ext_country_shapes.values).query(
+        df.geometry.values, predicate="intersects"
+    )
+    first_shape_i = pd.Series(shape_i).groupby(geom_i).min()
+
+    if exclude_external:
+        country_names = np.full(len(df), None, dtype=object)
+    else:
+        country_names = df[col_country].to_numpy(dtype=object, copy=True)
+    country_names[first_shape_i.index] = ext_country_shapes.index[first_shape_i]
+
+    df[col_country] = country_names
     df.dropna(subset=[col_country], inplace=True)
     return df
 
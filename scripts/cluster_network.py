@@ -134,6 +134,7 @@ from _helpers import (
     configure_logging,
     create_logger,
     get_aggregation_strategies,
+    locate_bus,
     sets_path_to_root,
     update_p_nom_max,
 )
@@ -145,7 +146,6 @@ from pypsa.clustering.spatial import (
     busmap_by_kmeans,
     get_clustering_from_busmap,
 )
-from shapely.geometry import Point
 
 idx = pd.IndexSlice
 
@@ -293,6 +293,7 @@ def distribute_clusters(
             update,
             out_logging,
             name_file_nc="GDP_PPP_1990_2015_5arcmin_v2.nc",
+            nprocesses=nprocesses,
         )
 
         G = df_gdp_c.loc[:, ("country", "gdp")]
@@ -383,22 +384,8 @@ def busmap_for_gadm_clusters(inputs, n, gadm_level, geo_crs, country_list):
     # gdf = get_GADM_layer(country_list, gadm_level, geo_crs)
     gdf = gpd.read_file(inputs.gadm_shapes)
 
-    def locate_bus(coords, co):
-        gdf_co = gdf[gdf["GADM_ID"].str.contains(co)]
-        point = Point(coords["x"], coords["y"])
-
-        try:
-            return gdf_co[gdf_co.contains(point)]["GADM_ID"].item()
-
-        except ValueError:
-            return gdf_co[
-                gdf_co.geometry == min(gdf_co.geometry, key=(point.distance))
-            ]["GADM_ID"].item()
-
     buses = n.buses
-    buses["gadm_{}".format(gadm_level)] = buses[["x", "y", "country"]].apply(
-        lambda bus: locate_bus(bus[["x", "y"]], bus["country"]), axis=1
-    )
+    buses["gadm_{}".format(gadm_level)] = locate_bus(buses, gdf)
 
     buses["gadm_subnetwork"] = (
         buses["gadm_{}".format(gadm_level)] + "_" + buses["carrier"].astype(str)
@@ -16,15 +16,15 @@ Relevant Settings
     options:
         add_to_snakefile: false # When set to true, enables Monte Carlo sampling
         samples: 9 # number of optimizations. Note that number of samples when using scipy has to be the square of a prime number
-        sampling_strategy: "chaospy"  # "pydoe2", "chaospy", "scipy", packages that are supported
+        sampling_strategy: "scipy"  # "pydoe2", "chaospy", "scipy", packages that are supported
         seed: 42 # set seedling for reproducibilty
     uncertainties:
         loads_t.p_set:
           type: uniform
           args: [0, 1]
         generators_t.p_max_pu.loc[:, n.generators.carrier == "onwind"]:
-          type: lognormal
-          args: [1.5]
+          type: uniform
+          args: [0.8, 1]
         generators_t.p_max_pu.loc[:, n.generators.carrier == "solar"]:
           type: beta
           args: [0.5, 2]
@@ -35,6 +35,7 @@ Relevant Settings
 Inputs
 ------
 - ``networks/elec_s_10_ec_lcopt_Co2L-24H.nc``
+- ``resources/monte_carlo/experimental_design.npy``: experimental design created by :mod:`build_monte_carlo_design`
 
 Outputs
 -------
@@ -67,21 +68,30 @@ networks. Thereby, this script creates samples x amount of networks. The iterato
 wildcard {unc}, which is described in the config.yaml and created in the Snakefile as a range from
 0 to (total number of) SAMPLES.
 """
+import logging
 import os
+from functools import partial, reduce
 
-import chaospy
 import numpy as np
 import pandas as pd
 import pypsa
-import seaborn as sns
 from _helpers import configure_logging, create_logger
-from pyDOE2 import lhs
-from scipy.stats import beta, gamma, lognorm, norm, qmc, triang
-from sklearn.preprocessing import MinMaxScaler
 from solve_network import *
 
 logger = create_logger(__name__)
-sns.set(style="whitegrid")
+
+
+def log_samples_mindist(lh: np.ndarray) -> None:
+    """
+    Logs the minimum distance between the samples as a space-filling measure
+    of the experimental design. Contrary to the discrepancy, it is computed
+    with a KD-tree in O(N log N) and is not restricted to the unit hypercube.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        from scipy.spatial import cKDTree
+
+        distances, _ = cKDTree(lh).query(lh, k=2)
+        logger.debug("Minimum distance between samples is: %s", distances[:, 1].min())
 
 
 def monte_carlo_sampling_pydoe2(
@@ -101,7 +111,6 @@ def monte_carlo_sampling_pydoe2(
     Documentation on PyDOE2: https://github.com/clicumu/pyDOE2 (fixes latin_cube errors)
     """
     from pyDOE2 import lhs
-    from scipy.stats import qmc
 
     # Generate a Nfeatures-dimensional latin hypercube varying between 0 and 1:
     lh = lhs(
@@ -114,10 +123,7 @@ def monte_carlo_sampling_pydoe2(
     )
 
     lh = rescale_distribution(lh, uncertainties_values)
-    discrepancy = qmc.discrepancy(lh)
-    logger.info(
-        "Discrepancy is:", discrepancy, " more details in function documentation."
-    )
+    log_samples_mindist(lh)
 
     return lh
 
@@ -136,20 +142,13 @@ def monte_carlo_sampling_chaospy(
     Documentation on Chaospy latin-hyper cube (quasi-Monte Carlo method): https://chaospy.readthedocs.io/en/master/user_guide/fundamentals/quasi_random_samples.html#Quasi-random-samples
     """
     import chaospy
-    from scipy.stats import qmc
 
     # generate a Nfeatures-dimensional latin hypercube varying between 0 and 1:
-    N_FEATURES = "chaospy.Uniform(0, 1), " * N_FEATURES
-    uniform_cube = eval(
-        f"chaospy.J({N_FEATURES})"
-    )  # writes Nfeatures times the chaospy.uniform... command)
+    uniform_cube = chaospy.J(*[chaospy.Uniform(0, 1) for _ in range(N_FEATURES)])
     lh = uniform_cube.sample(SAMPLES, rule=rule, seed=seed).T
 
     lh = rescale_distribution(lh, uncertainties_values)
-    discrepancy = qmc.discrepancy(lh)
-    logger.info(
-        "Discrepancy is:", discrepancy, " more details in function documentation."
-    )
+    log_samples_mindist(lh)
 
     return lh
 
@@ -190,10 +189,7 @@ def monte_carlo_sampling_scipy(
     lh = sampler.random(n=SAMPLES)
 
     lh = rescale_distribution(lh, uncertainties_values)
-    discrepancy = qmc.discrepancy(lh)
-    logger.info(
-        "Discrepancy is:", discrepancy, " more details in function documentation."
-    )
+    log_samples_mindist(lh)
 
     return lh
 
@@ -216,13 +212,13 @@ def rescale_distribution(
 
     **Returns**:
 
-    - np.array: Rescaled Latin hypercube sampling with values in the range [0, 1].
+    - np.array: Rescaled Latin hypercube sampling following the specified distributions.
 
     **Supported Distributions**:
 
-    - "uniform": Rescaled to the specified lower and upper bounds.
+    - "uniform": Mapped from the unit interval to the specified lower and upper bounds.
     - "normal": Rescaled using the inverse of the normal distribution function with specified mean and std.
-    - "lognormal": Rescaled using the inverse of the log-normal distribution function with specified mean and std.
+    - "lognormal": Rescaled using the inverse of the log-normal distribution function with specified shape and a median of 1.
     - "triangle": Rescaled using the inverse of the triangular distribution function with mean calculated from given parameters.
     - "beta": Rescaled using the inverse of the beta distribution function with specified shape parameters.
     - "gamma": Rescaled using the inverse of the gamma distribution function with specified shape and scale parameters.
@@ -230,46 +226,154 @@ def rescale_distribution(
     **Note**:
 
     - The function supports rescaling for uniform, normal, lognormal, triangle, beta, and gamma distributions.
-    - The rescaled samples will have values in the range [0, 1].
+    - The rescaled samples are used as scaling factors as they are, hence they keep the
+      location and spread of the specified distributions.
     """
-    from scipy.stats import beta, gamma, lognorm, norm, qmc, triang
-    from sklearn.preprocessing import MinMaxScaler, minmax_scale
+    from scipy.stats import beta, gamma, lognorm, norm, triang
 
-    for idx, value in enumerate(uncertainties_values):
-        dist = value.get("type")
-        params = value.get("args")
+    uncertainties_values = list(uncertainties_values)
+    dist_types = np.array([value.get("type") for value in uncertainties_values])
+
+    # features sharing a distribution are transformed by a single call, the
+    # parameters being broadcast over the columns of those features
+    for dist in np.unique(dist_types):
+        idx = np.flatnonzero(dist_types == dist)
+        params = np.array(
+            [uncertainties_values[j].get("args") for j in idx], dtype=float
+        ).T
+        samples = latin_hypercube[:, idx]
 
         match dist:
             case "uniform":
                 l_bounds, u_bounds = params
-                latin_hypercube[:, idx] = minmax_scale(
-                    latin_hypercube[:, idx], feature_range=(l_bounds, u_bounds)
-                )
+                # affine map of the unit interval, as done by qmc.scale
+                samples = l_bounds + (u_bounds - l_bounds) * samples
             case "normal":
                 mean, std = params
-                latin_hypercube[:, idx] = norm.ppf(latin_hypercube[:, idx], mean, std)
+                samples = norm.ppf(samples, mean, std)
             case "lognormal":
-                shape = params[0]
-                latin_hypercube[:, idx] = lognorm.ppf(latin_hypercube[:, idx], s=shape)
+                (shape,) = params
+                samples = lognorm.ppf(samples, s=shape)
             case "triangle":
-                mid_point = params[0]
-                latin_hypercube[:, idx] = triang.ppf(latin_hypercube[:, idx], mid_point)
+                (mid_point,) = params
+                samples = triang.ppf(samples, mid_point)
             case "beta":
                 a, b = params
-                latin_hypercube[:, idx] = beta.ppf(latin_hypercube[:, idx], a, b)
+                samples = beta.ppf(samples, a, b)
             case "gamma":
                 shape, scale = params
-                latin_hypercube[:, idx] = gamma.ppf(
-                    latin_hypercube[:, idx], shape, scale
-                )
+                samples = gamma.ppf(samples, shape, scale)
 
-    # samples space needs to be from 0 to 1
-    mm = MinMaxScaler(feature_range=(0, 1), clip=True)
-    latin_hypercube = mm.fit_transform(latin_hypercube)
+        latin_hypercube[:, idx] = samples
 
     return latin_hypercube
 
 
+def scale_network_features(n, features: list, factors: np.ndarray) -> None:
+    """
+    Scales in place the PyPSA network attributes described by the keys of the
+    monte-carlo uncertainties, e.g. "loads_t.p_set" or
+    "generators_t.p_max_pu.loc[:, n.generators.carrier == "onwind"]".
+
+    The attributes are reached by traversing the dotted path from the network,
+    only the optional ``.loc[...]`` selection is evaluated as an expression.
+    The selection is deliberately kept as a python expression to support the
+    boolean masks of the config, e.g. ``n.generators.carrier == "onwind"``.
+    It is evaluated with only ``np`` and ``n`` in scope and without builtins,
+    which limits typos and misuse but is no sandbox for untrusted configs.
+    Features selecting columns of the same attribute are combined into one
+    vector of factors, so that each attribute is multiplied only once.
+
+    **Parameters**:
+
+    - n: pypsa.Network
+        The network to be modified
+    - features: list
+        Keys of the uncertainties in the monte_carlo config
+    - factors: np.ndarray
+        Scaling factors sampled for the features
+    """
+    # selections are evaluated before any attribute is scaled, so that they
+    # do not depend on the order of the features
+    features_by_path = {}
+    for feature, factor in zip(features, factors):
+        path, _, selection = feature.partition(".loc[")
+        if selection:
+            # the selection may reference the network as in the config, e.g. n.generators
+            loc = eval(
+                f"np.s_[{selection.removesuffix(']')}]",
+                {"__builtins__": {}, "np": np, "n": n},
+            )
+        else:
+            loc = None
+        features_by_path.setdefault(path, []).append((loc, factor))
+
+    for path, selections in features_by_path.items():
+        *parents, attr = path.split(".")
+        parent = reduce(getattr, parents, n)
+        value = getattr(parent, attr)
+
+        if not isinstance(value, (pd.DataFrame, pd.Series)):
+            for _, factor in selections:
+                value = value * factor
+            setattr(parent, attr, value)
+            continue
+
+        is_frame = isinstance(value, pd.DataFrame)
+        scale = pd.Series(1.0, index=value.columns if is_frame else value.index)
+        for loc, factor in selections:
+            if loc is None:
+                scale *= factor
+                continue
+            if is_frame:
+                if not (
+                    isinstance(loc, tuple)
+                    and isinstance(loc[0], slice)
+                    and loc[0] == slice(None)
+                ):
+                    # selections of rows can not be folded into the column factors
+                    value.loc[loc] = value.loc[loc] * factor
+                    continue
+                loc = loc[1]
+            scale.loc[loc] *= factor
+
+        setattr(parent, attr, value * scale)
+
+
+def create_experimental_design(
+    sampling_strategy: str,
+    n_features: int,
+    samples: int,
+    uncertainties_values: dict,
+    seed: int,
+) -> np.ndarray:
+    """
+    Creates the experimental design (samples X features) with the chosen
+    sampling strategy.
+    """
+    samplers = {
+        "pydoe2": partial(
+            monte_carlo_sampling_pydoe2,
+            random_state=seed,
+            criterion=None,
+            iteration=None,
+            correlation_matrix=None,
+        ),
+        "scipy": partial(
+            monte_carlo_sampling_scipy,
+            seed=seed,
+            strength=2,
+            optimization="random-cd",
+        ),
+        "chaospy": partial(
+            monte_carlo_sampling_chaospy, seed=seed, rule="latin_hypercube"
+        ),
+    }
+    lh = samplers[sampling_strategy](n_features, samples, uncertainties_values)
+
+    return lh
+
+
 def validate_parameters(
     sampling_strategy: str, samples: int, uncertainties_values: dict
 ) -> None:
@@ -367,48 +471,18 @@ if __name__ == "__main__":
     MONTE_CARLO_PYPSA_FEATURES = [
         k for k in monte_carlo_config["uncertainties"].keys() if k
     ]  # removes key value pairs with empty value e.g. []
-    MONTE_CARLO_OPTIONS = monte_carlo_config["options"]
     N_FEATURES = len(
         MONTE_CARLO_PYPSA_FEATURES
     )  # only counts features when specified in config
-    SAMPLES = MONTE_CARLO_OPTIONS.get(
-        "samples"
-    )  # TODO: What is the optimal sampling? Fabian Neumann answered that in "Broad ranges" paper
-    SAMPLING_STRATEGY = MONTE_CARLO_OPTIONS.get("sampling_strategy")
-    UNCERTAINTIES_VALUES = monte_carlo_config["uncertainties"].values()
-    SEED = MONTE_CARLO_OPTIONS.get("seed")
-
-    # PARAMETERS VALIDATION
-    # validates the parameters supplied from config file
-    validate_parameters(SAMPLING_STRATEGY, SAMPLES, UNCERTAINTIES_VALUES)
-
     # SCENARIO CREATION / SAMPLING STRATEGY
     ###
-    if SAMPLING_STRATEGY == "pydoe2":
-        lh = monte_carlo_sampling_pydoe2(
-            N_FEATURES,
-            SAMPLES,
-            UNCERTAINTIES_VALUES,
-            random_state=SEED,
-            criterion=None,
-            iteration=None,
-            correlation_matrix=None,
-        )
-    if SAMPLING_STRATEGY == "scipy":
-        lh = monte_carlo_sampling_scipy(
-            N_FEATURES,
-            SAMPLES,
-            UNCERTAINTIES_VALUES,
-            seed=SEED,
-            strength=2,
-            optimization=None,
-        )
-    if SAMPLING_STRATEGY == "chaospy":
-        lh = monte_carlo_sampling_chaospy(
-            N_FEATURES, SAMPLES, UNCERTAINTIES_VALUES, seed=SEED, rule="latin_hypercube"
-        )
+    # the experimental design is shared by all the {unc} networks,
+    # hence it is sampled once by the build_monte_carlo_design rule
+    lh = np.load(snakemake.input.experimental_design)
 
     # create plot for the rescaled distributions (for development usage, commented by default)
+    # import seaborn as sns
+    # sns.set(style="whitegrid")
     # for idx in range(N_FEATURES):
     #     sns.displot(lh[:, idx], kde=True).set(
     #         title=f"{MONTE_CARLO_PYPSA_FEATURES[idx]}"
@@ -416,24 +490,21 @@ if __name__ == "__main__":
 
     # MONTE-CARLO MODIFICATIONS
     ###
-    n = pypsa.Network(snakemake.input[0])
+    n = pypsa.Network(snakemake.input.network)
     unc_wildcards = snakemake.wildcards[-1]
     i = int(unc_wildcards[1:])
-    j = 0
-    for k in MONTE_CARLO_PYPSA_FEATURES:
-        # this loop sets in one scenario each "i" feature assumption
-        # k is the config input key "loads_t.p_set"
-        # v is the lower and upper bound [0.8,1.3], that was used for lh_scaled
-        # i, j interaction number to pick values of experimental setup
-        # Example: n.loads_t.p_set = network.loads_t.p_set = .loads_t.p_set * lh_scaled[0,0]
-        exec(f"n.{k} = n.{k} * {lh[i,j]}")
-        logger.info(f"Scaled n.{k} by factor {lh[i,j]} in the {i} scenario")
-        j = j + 1
+    # sets in one scenario each "i" feature assumption, the row "i"
+    # of the experimental setup holds the factors of all the features
+    # Example: n.loads_t.p_set is scaled in place by lh[0,0]
+    factors = lh[i]
+    scale_network_features(n, MONTE_CARLO_PYPSA_FEATURES, factors)
+    for k, factor in zip(MONTE_CARLO_PYPSA_FEATURES, factors.tolist()):
+        logger.info(f"Scaled n.{k} by factor {factor} in the {i} scenario")
 
     # EXPORT AND METADATA
     #
-    latin_hypercube_dict = (
-        pd.DataFrame(lh).rename_axis("Nruns").add_suffix("_feature")
-    ).to_dict()
+    latin_hypercube_dict = {
+        f"{j}_feature": dict(enumerate(lh[:, j].tolist())) for j in range(N_FEATURES)
+    }
     n.meta.update(latin_hypercube_dict)
     n.export_to_netcdf(snakemake.output[0])
@@ -42,6 +42,7 @@ Inputs
 
 - ``resources/costs.csv.``: The database of cost assumptions for all included technologies for specific years from various sources; e.g. discount rate, lifetime, investment (CAPEX), fixed operation and maintenance (FOM), variable operation and maintenance (VOM), fuel costs, efficiency, carbon-dioxide intensity.
 - ``networks/elec_s{simpl}_{clusters}.nc``: confer :ref:`cluster`
+- ``resources/edgar_co2.csv``: CO2 emissions of public electricity and heat production by country, only required with ``automatic_emission``, confer :mod:`build_emission_data`
 
 Outputs
 -------
@@ -58,57 +59,36 @@ Description
 """
 import os
 import re
-from zipfile import ZipFile
 
-import country_converter as cc
+import country_converter as coco
 import numpy as np
 import pandas as pd
 import pypsa
-import requests
 from _helpers import configure_logging, create_logger
 from add_electricity import load_costs, update_transmission_costs
+from pandas.tseries.frequencies import to_offset
 
 idx = pd.IndexSlice
 
 logger = create_logger(__name__)
 
+cc = coco.CountryConverter()
 
-def download_emission_data():
-    """
-    Download emission file from EDGAR.
-
-    Returns
-    -------
-    global emission file for all countries in the world.
-    """
-
-    try:
-        url = "https://jeodpp.jrc.ec.europa.eu/ftp/jrc-opendata/EDGAR/datasets/v60_GHG/CO2_excl_short-cycle_org_C/v60_GHG_CO2_excl_short-cycle_org_C_1970_2018.zip"
-        with requests.get(url) as rq:
-            with open("data/co2.zip", "wb") as file:
-                file.write(rq.content)
-        rootpath = os.getcwd()
-        file_path = os.path.join(rootpath, "data/co2.zip")
-        with ZipFile(file_path, "r") as zipObj:
-            zipObj.extract(
-                "v60_CO2_excl_short-cycle_org_C_1970_2018.xls", rootpath + "/data"
-            )
-        os.remove(file_path)
-        return "v60_CO2_excl_short-cycle_org_C_1970_2018.xls"
-    except:
-        logger.error(f"Failed download resource from '{url}'.")
-        return False
+# patterns of the {opts} wildcard entries
+nhours_pattern = re.compile(r"^\d+h$", re.IGNORECASE)
+segments_pattern = re.compile(r"^\d+seg$", re.IGNORECASE)
+number_pattern = re.compile(r"[0-9]*\.?[0-9]+$")
 
 
 def emission_extractor(filename, emission_year, country_names):
     """
     Extracts CO2 emission values for given country codes from the global
-    emission file.
+    emission table.
 
     Parameters
     ----------
     filename : str
-        Global emission filename
+        Path of the global emission table created by :mod:`build_emission_data`
     emission_year : int
         Year of CO2 emissions
     country_names : numpy.ndarray
@@ -119,24 +99,12 @@ def emission_extractor(filename, emission_year, country_names):
     CO2 emission values of studied countries.
     """
 
-    # data reading process
-    datapath = os.path.join(os.getcwd(), "data", filename)
-    df = pd.read_excel(datapath, sheet_name="v6.0_EM_CO2_fossil_IPCC1996", skiprows=8)
-    df.columns = df.iloc[0]
-    df = df.set_index("Country_code_A3")
-    df = df.loc[
-        df["IPCC_for_std_report_desc"] == "Public electricity and heat production"
-    ]
-    df = df.loc[:, "Y_1970":"Y_2018"].astype(float).ffill(axis=1)
-    df = df.loc[:, "Y_1970":"Y_2018"].astype(float).bfill(axis=1)
-    cc_iso3 = cc.convert(names=country_names, to="ISO3")
-    if len(country_names) == 1:
-        cc_iso3 = [cc_iso3]
-    emission_by_country = df.loc[
-        df.index.intersection(cc_iso3), "Y_" + str(emission_year)
-    ]
-    missing_ccs = np.setdiff1d(cc_iso3, df.index.intersection(cc_iso3))
-    if missing_ccs.size:
+    df = pd.read_csv(filename, index_col="Country_code_A3")
+    cc_iso3 = cc.pandas_convert(pd.Series(country_names), to="ISO3").values
+    found_ccs = df.index.intersection(cc_iso3)
+    emission_by_country = df.loc[found_ccs, "Y_" + str(emission_year)]
+    missing_ccs = sorted(set(cc_iso3).difference(found_ccs))
+    if missing_ccs:
         logger.warning(
             f"The emission value for the following countries has not been found: {missing_ccs}"
         )
@@ -169,13 +137,22 @@ def add_gaslimit(n, gaslimit, Nyears=1.0):
 def add_emission_prices(n, emission_prices={"co2": 0.0}, exclude_co2=False):
     if exclude_co2:
         emission_prices.pop("co2")
-    ep = (
-        pd.Series(emission_prices).rename(lambda x: x + "_emissions")
-        * n.carriers.filter(like="_emissions")
-    ).sum(axis=1)
-    gen_ep = n.generators.carrier.map(ep) / n.generators.efficiency
+    emissions = n.carriers.filter(like="_emissions")
+    prices = (
+        pd.Series(emission_prices, dtype=float)
+        .rename(lambda x: x + "_emissions")
+        .reindex(emissions.columns, fill_value=0.0)
+    )
+    ep = pd.Series(
+        emissions.fillna(0.0).to_numpy(dtype=float) @ prices.to_numpy(),
+        index=n.carriers.index,
+    )
+    gen_ep = ep.reindex(n.generators.carrier).to_numpy() / n.generators.efficiency
     n.generators["marginal_cost"] += gen_ep
-    su_ep = n.storage_units.carrier.map(ep) / n.storage_units.efficiency_dispatch
+    su_ep = (
+        ep.reindex(n.storage_units.carrier).to_numpy()
+        / n.storage_units.efficiency_dispatch
+    )
     n.storage_units["marginal_cost"] += su_ep
 
 
@@ -185,14 +162,11 @@ def set_line_s_max_pu(n, s_max_pu):
 
 
 def set_transmission_limit(n, ll_type, factor, costs, Nyears=1):
-    links_dc_b = n.links.carrier == "DC" if not n.links.empty else pd.Series()
+    links_dc_b = n.links.carrier.to_numpy() == "DC"
 
-    _lines_s_nom = (
-        np.sqrt(3)
-        * n.lines.type.map(n.line_types.i_nom)
-        * n.lines.num_parallel
-        * n.lines.bus0.map(n.buses.v_nom)
-    )
+    i_nom = n.line_types.i_nom.reindex(n.lines.type).to_numpy()
+    v_nom = n.buses.v_nom.reindex(n.lines.bus0).to_numpy()
+    _lines_s_nom = np.sqrt(3) * i_nom * n.lines.num_parallel.to_numpy() * v_nom
     lines_s_nom = n.lines.s_nom.where(n.lines.type == "", _lines_s_nom)
 
     col = "capital_cost" if ll_type == "c" else "length"
@@ -231,23 +205,49 @@ def average_every_nhours(n, offset):
     # letters is deprecated in future versions of pandas.
     # For example 24H is deprecated. Instead, 24h is allowed.
 
+    freq = n.snapshots.inferred_freq
+    if freq is not None and to_offset(freq) == to_offset(offset.casefold()):
+        logger.info(f"The network already has a resolution of {offset}")
+        return n
+
     logger.info(f"Resampling the network to {offset}")
-    m = n.copy(with_time=False)
 
+    # all time-dependent data are resampled at once, so that the bins are
+    # computed a single time rather than once per component attribute
+    work = [
+        (c.pnl, k, df)
+        for c in n.iterate_components()
+        for k, df in c.pnl.items()
+        if not df.empty
+    ]
+
+    if work:
+        resampled = (
+            pd.concat([df for _, _, df in work], axis=1, keys=range(len(work)))
+            .resample(offset.casefold())
+            .mean()
+        )
+
+    # the network is resampled in place, as copying its static data is
+    # not needed: only the snapshots and the time series are replaced
     snapshot_weightings = n.snapshot_weightings.resample(offset.casefold()).sum()
-    m.set_snapshots(snapshot_weightings.index)
-    m.snapshot_weightings = snapshot_weightings
+    n.set_snapshots(snapshot_weightings.index)
+    n.snapshot_weightings = snapshot_weightings
 
-    for c in n.iterate_components():
-        pnl = getattr(m, c.list_name + "_t")
-        for k, df in c.pnl.items():
-            if not df.empty:
-                pnl[k] = df.resample(offset.casefold()).mean()
+    for i, (pnl, k, df) in enumerate(work):
+        pnl[k] = resampled[i].rename_axis(df.columns.name, axis=1)
 
-    return m
+    return n
 
 
 def apply_time_segmentation(n, segments, solver_name):
+    if int(segments) >= len(n.snapshots):
+        logger.info(
+            f"Skipping the aggregation to {segments} segments, "
+            f"as the network has only {len(n.snapshots)} snapshots."
+        )
+        return n
+
     logger.info(f"Aggregating time series to {segments} segments.")
     try:
         import tsam.timeseriesaggregation as tsam
@@ -256,16 +256,14 @@ def apply_time_segmentation(n, segments, solver_name):
             "Optional dependency 'tsam' not found." "Install via 'pip install tsam'"
         )
 
-    p_max_pu_norm = n.generators_t.p_max_pu.max()
-    p_max_pu = n.generators_t.p_max_pu / p_max_pu_norm
-
-    load_norm = n.loads_t.p_set.max()
-    load = n.loads_t.p_set / load_norm
-
-    inflow_norm = n.storage_units_t.inflow.max()
-    inflow = n.storage_units_t.inflow / inflow_norm
+    p_max_pu = n.generators_t.p_max_pu
+    load = n.loads_t.p_set
+    inflow = n.storage_units_t.inflow
 
-    raw = pd.concat([p_max_pu, load, inflow], axis=1, sort=False)
+    # the time series are normalized together after being concatenated
+    raw = pd.concat([p_max_pu, load, inflow], axis=1, sort=False, copy=False)
+    norm = raw.max()
+    raw /= norm
 
     agg = tsam.TimeSeriesAggregation(
         raw,
@@ -280,29 +278,36 @@ def apply_time_segmentation(n, segments, solver_name):
 
     weightings = segmented.index.get_level_values("Segment Duration")
     offsets = np.insert(np.cumsum(weightings[:-1]), 0, 0)
-    snapshots = [n.snapshots[0] + pd.Timedelta(f"{offset}h") for offset in offsets]
+    snapshots = pd.DatetimeIndex(
+        n.snapshots[0] + pd.to_timedelta(offsets, unit="h"), name="name"
+    )
 
-    n.set_snapshots(pd.DatetimeIndex(snapshots, name="name"))
+    n.set_snapshots(snapshots)
     n.snapshot_weightings = pd.Series(
         weightings, index=snapshots, name="weightings", dtype="float64"
     )
 
     segmented.index = snapshots
-    n.generators_t.p_max_pu = segmented[n.generators_t.p_max_pu.columns] * p_max_pu_norm
-    n.loads_t.p_set = segmented[n.loads_t.p_set.columns] * load_norm
-    n.storage_units_t.inflow = segmented[n.storage_units_t.inflow.columns] * inflow_norm
+    n.generators_t.p_max_pu = segmented[p_max_pu.columns] * norm[p_max_pu.columns]
+    n.loads_t.p_set = segmented[load.columns] * norm[load.columns]
+    n.storage_units_t.inflow = segmented[inflow.columns] * norm[inflow.columns]
 
     return n
 
 
 def enforce_autarky(n, only_crossborder=False):
     if only_crossborder:
-        lines_rm = n.lines.loc[
-            n.lines.bus0.map(n.buses.country) != n.lines.bus1.map(n.buses.country)
-        ].index
-        links_rm = n.links.loc[
-            n.links.bus0.map(n.buses.country) != n.links.bus1.map(n.buses.country)
-        ].index
+        # countries are compared through the integer codes of the buses;
+        # a missing country (code -1) never matches, as NaN != NaN
+        bus_country = pd.Series(pd.factorize(n.buses.country)[0], n.buses.index)
+
+        def _is_crossborder(branches):
+            c0 = bus_country.reindex(branches.bus0, fill_value=-1).to_numpy()
+            c1 = bus_country.reindex(branches.bus1, fill_value=-1).to_numpy()
+            return (c0 != c1) | (c0 == -1) | (c1 == -1)
+
+        lines_rm = n.lines.index[_is_crossborder(n.lines)]
+        links_rm = n.links.index[_is_crossborder(n.links)]
     else:
         lines_rm = n.lines.index
         links_rm = n.links.loc[n.links.carrier == "DC"].index
@@ -311,8 +316,11 @@ def enforce_autarky(n, only_crossborder=False):
 
 
 def set_line_nom_max(n, s_nom_max_set=np.inf, p_nom_max_set=np.inf):
-    n.lines.s_nom_max = n.lines.s_nom_max.clip(upper=s_nom_max_set)
-    n.links.p_nom_max = n.links.p_nom_max.clip(upper=p_nom_max_set)
+    # clipping to an infinite bound leaves the limits unchanged
+    if np.isfinite(s_nom_max_set):
+        n.lines.s_nom_max = n.lines.s_nom_max.clip(upper=s_nom_max_set)
+    if np.isfinite(p_nom_max_set):
+        n.links.p_nom_max = n.links.p_nom_max.clip(upper=p_nom_max_set)
 
 
 if __name__ == "__main__":
@@ -344,13 +352,13 @@ if __name__ == "__main__":
     set_line_s_max_pu(n, s_max_pu)
 
     for o in opts:
-        m = re.match(r"^\d+h$", o, re.IGNORECASE)
+        m = nhours_pattern.match(o)
         if m is not None:
             n = average_every_nhours(n, m.group(0))
             break
 
     for o in opts:
-        m = re.match(r"^\d+seg$", o, re.IGNORECASE)
+        m = segments_pattern.match(o)
         if m is not None:
             solver_name = snakemake.config["solving"]["solver"]["name"]
             n = apply_time_segmentation(n, m.group(0)[:-3], solver_name)
@@ -358,15 +366,14 @@ if __name__ == "__main__":
 
     for o in opts:
         if "Co2L" in o:
-            m = re.findall("[0-9]*\.?[0-9]+$", o)
+            m = number_pattern.findall(o)
             if snakemake.params.electricity["automatic_emission"]:
                 country_names = n.buses.country.unique()
                 emission_year = snakemake.params.electricity[
                     "automatic_emission_base_year"
                 ]
-                filename = download_emission_data()
                 co2limit = emission_extractor(
-                    filename, emission_year, country_names
+                    snakemake.input.emission_data, emission_year, country_names
                 ).sum()
                 if len(m) > 0:
                     co2limit = co2limit * float(m[0])
@@ -382,7 +389,7 @@ if __name__ == "__main__":
 
     for o in opts:
         if "CH4L" in o:
-            m = re.findall("[0-9]*\.?[0-9]+$", o)
+            m = number_pattern.findall(o)
             if len(m) > 0:
                 limit = float(m[0]) * 1e6
                 add_gaslimit(n, limit, Nyears)
@@ -409,12 +416,16 @@ if __name__ == "__main__":
                 else:
                     comps = {"Generator", "Link", "StorageUnit", "Store"}
                     for c in n.iterate_components(comps):
-                        sel = c.df.carrier.str.contains(carrier)
+                        # the pattern is matched once per distinct carrier
+                        carriers = pd.Series(c.df.carrier.unique())
+                        sel = c.df.carrier.isin(
+                            carriers[carriers.str.contains(carrier)]
+                        )
                         c.df.loc[sel, attr] *= factor
 
         for o in opts:
             if "Ep" in o:
-                m = re.findall("[0-9]*\.?[0-9]+$", o)
+                m = number_pattern.findall(o)
                 if len(m) > 0:
                     logger.info("Setting emission prices according to wildcard value.")
                     add_emission_prices(n, dict(co2=float(m[0])))
@@ -438,4 +449,6 @@ if __name__ == "__main__":
         enforce_autarky(n, only_crossborder=True)
 
     n.meta = dict(snakemake.config, **dict(wildcards=dict(snakemake.wildcards)))
-    n.export_to_netcdf(snakemake.output[0])
+    # the prepared network is an intermediate file read back by the solving
+    # rule, hence a fast compression is preferred over a small file
+    n.export_to_netcdf(snakemake.output[0], compression={"zlib": True, "complevel": 1})
@@ -25,6 +25,8 @@ Relevant Settings
             max_iterations:
             skip_iterations:
             track_iterations:
+            warmstart:
+            store_basis:
         solver:
             name:
 
@@ -163,19 +165,16 @@ def add_CCL_constraints(n, config):
         "Adding per carrier generation capacity constraints for " "individual countries"
     )
 
-    gen_country = n.generators.bus.map(n.buses.country)
-    # cc means country and carrier
+    # only extendable generators have a capacity variable
+    p_nom = get_var(n, "Generator", "p_nom")
+    ext_gens = n.generators.loc[p_nom.index]
+    # cc means country and carrier, grouped in a single pass
     p_nom_per_cc = (
-        pd.DataFrame(
-            {
-                "p_nom": linexpr((1, get_var(n, "Generator", "p_nom"))),
-                "country": gen_country,
-                "carrier": n.generators.carrier,
-            }
+        linexpr((1, p_nom))
+        .groupby(
+            [ext_gens.bus.map(n.buses.country).rename("country"), ext_gens.carrier]
         )
-        .dropna(subset=["p_nom"])
-        .groupby(["country", "carrier"])
-        .p_nom.apply(join_exprs)
+        .apply(join_exprs)
     )
     minimum = agg_p_nom_minmax["min"].dropna()
     if not minimum.empty:
@@ -210,11 +209,13 @@ def add_EQ_constraints(n, o, scaling=1e-1):
     )
     inflow = inflow.reindex(load.index).fillna(0.0)
     rhs = scaling * (level * load - inflow)
+    # the expressions are grouped along the component axis directly, so that
+    # the snapshots are collapsed together with the components of each group
     lhs_gen = (
         linexpr(
             (n.snapshot_weightings.generators * scaling, get_var(n, "Generator", "p").T)
         )
-        .T.groupby(ggrouper, axis=1)
+        .groupby(ggrouper)
         .apply(join_exprs)
     )
     lhs_spill = (
@@ -224,7 +225,7 @@ def add_EQ_constraints(n, o, scaling=1e-1):
                 get_var(n, "StorageUnit", "spill").T,
             )
         )
-        .T.groupby(sgrouper, axis=1)
+        .groupby(sgrouper)
         .apply(join_exprs)
     )
     lhs_spill = lhs_spill.reindex(lhs_gen.index).fillna("")
@@ -244,14 +245,10 @@ def add_BAU_constraints(n, config):
     )
     define_constraints(n, lhs, ">=", mincaps[lhs.index], "Carrier", "bau_mincaps")
 
+    # the same per carrier expressions bound the capacities from above
     maxcaps = pd.Series(
         config["electricity"].get("BAU_maxcapacities", {key: np.inf for key in ext_c})
     )
-    lhs = (
-        linexpr((1, get_var(n, "Generator", "p_nom")))
-        .groupby(n.generators.carrier)
-        .apply(join_exprs)
-    )
     define_constraints(n, lhs, "<=", maxcaps[lhs.index], "Carrier", "bau_maxcaps")
 
 
@@ -457,8 +454,11 @@ def add_RES_constraints(n, res_share):
         (
             linexpr(
                 (
-                    n.snapshot_weightings.stores.apply(
-                        lambda r: r * n.links.loc[discharger_i].efficiency
+                    pd.DataFrame(
+                        n.snapshot_weightings.stores.values[:, None]
+                        * n.links.loc[discharger_i, "efficiency"].values[None, :],
+                        index=n.snapshots,
+                        columns=discharger_i,
                     ),
                     get_var(n, "Link", "p")[discharger_i],
                 )
@@ -519,13 +519,19 @@ def solve_network(n, config, opts="", **kwargs):
     n.opts = opts
 
     if cf_solving.get("skip_iterations", False):
+        # a basis stored by a previous solve of a network with the same
+        # topology, e.g. in a scenario sweep, can be used as starting point
         network_lopf(
             n,
             solver_name=solver_name,
             solver_options=solver_options,
             extra_functionality=extra_functionality,
+            warmstart=cf_solving.get("warmstart", False),
+            store_basis=cf_solving.get("store_basis", False),
             **kwargs,
         )
+        if hasattr(n, "basis_fn"):
+            logger.info(f"Basis of the solution stored in {n.basis_fn}")
     else:
         ilopf(
             n,